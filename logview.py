@@ -23,67 +23,129 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 import argparse
-from dataclasses import dataclass
-from enum import Enum
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 import fnmatch
+from functools import cached_property
+from functools import lru_cache
+import io
+import os
 from pathlib import Path
 import re
+import string
+import sys
+import threading
 from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import FrozenSet
+from typing import IO
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import NamedTuple
 from typing import Optional
+from typing import Pattern
+from typing import Set
 from typing import Tuple
 from zipfile import ZipFile
 
-from colorama import Fore  # type: ignore
+# Prefer the Rust TOML parser rtoml when it is installed.
+try:
+    from rtoml import loads as toml_loads  # type: ignore
+except ModuleNotFoundError:
+    try:
+        from tomllib import loads as toml_loads  # type: ignore
+    except ModuleNotFoundError:
+        from tomli import loads as toml_loads  # type: ignore
+
+try:
+    import ahocorasick  # type: ignore
+except ModuleNotFoundError:
+    ahocorasick = None
 
 try:
-    import tomllib  # type: ignore
+    import hyperscan  # type: ignore
 except ModuleNotFoundError:
-    import tomli as tomllib  # type: ignore
-
-
-class ColorName(Enum):
-    """Lookup table to convert the Fore color name string to the ansi sequence."""
-
-    NONE = ""
-    BLACK = Fore.BLACK
-    BLUE = Fore.BLUE
-    CYAN = Fore.CYAN
-    GREEN = Fore.GREEN
-    LIGHTBLACK_EX = Fore.LIGHTBLACK_EX
-    LIGHTBLUE_EX = Fore.LIGHTBLUE_EX
-    LIGHTCYAN_EX = Fore.LIGHTCYAN_EX
-    LIGHTGREEN_EX = Fore.LIGHTGREEN_EX
-    LIGHTMAGENTA_EX = Fore.LIGHTMAGENTA_EX
-    LIGHTRED_EX = Fore.LIGHTRED_EX
-    LIGHTWHITE_EX = Fore.LIGHTWHITE_EX
-    LIGHTYELLOW_EX = Fore.LIGHTYELLOW_EX
-    RED = Fore.RED
-    RESET = Fore.RESET
-    WHITE = Fore.WHITE
-    YELLOW = Fore.YELLOW
-
-
-@dataclass
+    hyperscan = None
+
+
+ANSI_START = "\x1b["  # start of an ANSI terminal control sequence
+
+
+# Lookup table to convert the Fore color name string to the ansi sequence.
+# The names and sequences are the same as colorama.Fore.
+COLOR_MAP: Dict[str, str] = {
+    "NONE": "",
+    "BLACK": ANSI_START + "30m",
+    "BLUE": ANSI_START + "34m",
+    "CYAN": ANSI_START + "36m",
+    "GREEN": ANSI_START + "32m",
+    "LIGHTBLACK_EX": ANSI_START + "90m",
+    "LIGHTBLUE_EX": ANSI_START + "94m",
+    "LIGHTCYAN_EX": ANSI_START + "96m",
+    "LIGHTGREEN_EX": ANSI_START + "92m",
+    "LIGHTMAGENTA_EX": ANSI_START + "95m",
+    "LIGHTRED_EX": ANSI_START + "91m",
+    "LIGHTWHITE_EX": ANSI_START + "97m",
+    "LIGHTYELLOW_EX": ANSI_START + "93m",
+    "RED": ANSI_START + "31m",
+    "RESET": ANSI_START + "39m",
+    "WHITE": ANSI_START + "37m",
+    "YELLOW": ANSI_START + "33m",
+}
+RESET = COLOR_MAP["RESET"]
+
+
 class Highlighter:
     """Colorizes text using terminal color code sequence."""
 
-    text: str
-    color_enum: ColorName
+    __slots__ = ("text", "color_sequence", "highlighted")
 
-    def __post_init__(self) -> None:
-        if self.color_enum == ColorName.NONE:
-            self.highlighted = self.text
+    def __init__(self, text: str, color_sequence: str):
+        self.text = text
+        self.color_sequence = color_sequence
+        if not color_sequence:
+            self.highlighted = text
         else:
-            self.highlighted = self.color_enum.value + self.text + str(Fore.RESET)
+            self.highlighted = color_sequence + text + RESET
+
+
+FEW_PHRASES = 8  # Colorizer checks for this many phrases one at a time
+
+
+class Colorizer:
+    """Colorize all occurrences of several phrases in a line in one pass.
+
+    The phrases are combined into one regular expression so the line is
+    scanned once rather than once per phrase.
+    Most lines contain none of the phrases. When there are only a few
+    phrases, checking for each with the in operator finds that out faster
+    than the regular expression, so that is done first.
+    """
+
+    def __init__(self, phrases: List[Highlighter]):
+        self._highlighted = {p.text: p.highlighted for p in phrases if p.text}
+        pattern = "|".join(re.escape(text) for text in self._highlighted)
+        self._regex = re.compile(pattern) if pattern else None
+        self._few = len(self._highlighted) <= FEW_PHRASES
 
+    def colorize_line(self, line: str) -> str:
+        """Colorize all phrases in the line unless it is already colorized."""
+        if self._regex is None or ANSI_START in line:
+            return line
+        if self._few:
+            for text in self._highlighted:
+                if text in line:
+                    break
+            else:
+                return line
+        return self._regex.sub(self._replacement, line)
 
-def colorize_line(line: str, phrases: List[Highlighter]) -> str:
-    # Colorize all phrases in the line.
-    if chr(27) + "[" not in line:  # ANSI start sequence
-        for phrase in phrases:
-            line = line.replace(phrase.text, phrase.highlighted)
-    return line
+    def _replacement(self, match: "re.Match[str]") -> str:
+        return self._highlighted[match.group(0)]
 
 
 # todo- additional summaries
@@ -138,99 +200,399 @@ summary_exemptions = [
 """.lstrip()
 
 
+PatternParts = Tuple[str, ...]
+
+
+def split_pattern(pattern: str) -> PatternParts:
+    """Split an archive member pattern into parts for MemberFilter.select().
+
+    Archive member names always use "/" so a plain string split does it.
+    Like pathlib.PurePosixPath().parts, empty and "." parts are dropped
+    and a leading "/" is kept as a part of its own.
+    """
+    parts = tuple(part for part in pattern.split("/") if part and part != ".")
+    if pattern.startswith("/"):
+        return ("/",) + parts
+    return parts
+
+
+def stop_scan(*args: Any) -> bool:
+    """Hyperscan match event handler that stops the scan at the first match."""
+    return True
+
+
+# Below this many substrings the re module searches a line faster than
+# an Aho-Corasick automaton.
+AHOCORASICK_MIN = 16
+FEW_SUBSTRINGS = 8  # SubstringSet may check for this many one at a time
+
+
+class SubstringSet:
+    """Check if a line contains any of a fixed set of substrings.
+
+    The substrings are joined into one regular expression so the line is
+    searched by a single call into the re module. The time that takes grows
+    with the number of substrings. So when there are at least
+    AHOCORASICK_MIN of them and the optional package pyahocorasick is
+    installed they are built into an Aho-Corasick automaton instead, which
+    finds any of them in a single pass.
+
+    A block of many lines can be searched as its raw UTF-8 bytes too. When
+    the optional package hyperscan is installed the substrings are also
+    compiled into a Hyperscan database that finds any of them in a single
+    SIMD accelerated pass over the block. Hyperscan is not used for single
+    lines. Its per call cost is more than the re module takes for a line.
+
+    The regular expression is fastest when the substrings share a first
+    character. It has no common prefix to look for otherwise. Then, when
+    there are only a few substrings, checking for each with the in
+    operator is faster, so that is done instead.
+
+    With ignore_case a substring matches if its str.lower() is in the
+    str.lower() of the line. Every engine searches the lowered line the
+    same way so the result doesn't depend on which package is installed.
+    Most lines are ASCII. str.lower() doesn't change their length so they
+    are lowered whole and searched from pos without slicing them first.
+    """
+
+    def __init__(self, substrings: List[str], ignore_case: bool = False):
+        if ignore_case:
+            substrings = [s.lower() for s in substrings]
+        self.substrings = tuple(substrings)
+        self.ignore_case = ignore_case
+        # An empty string is in every line.
+        self._always = not all(self.substrings)
+        self._database = None
+        self._automaton = None
+        self._regex: Optional[Pattern[str]] = None
+        self._few = False
+        if not self.substrings or self._always:
+            return
+        if ahocorasick is not None and len(self.substrings) >= AHOCORASICK_MIN:
+            automaton = ahocorasick.Automaton()
+            for substring in self.substrings:
+                automaton.add_word(substring, substring)
+            automaton.make_automaton()
+            self._automaton = automaton
+        elif (
+            len(self.substrings) <= FEW_SUBSTRINGS
+            and len({s[0] for s in self.substrings}) > 1
+        ):
+            self._few = True
+        else:
+            self._regex = re.compile("|".join(re.escape(s) for s in self.substrings))
+        # Hyperscan expressions are C strings so can't contain a NUL.
+        # The raw bytes can't be lowered like str.lower() does so Hyperscan
+        # is only used when case matters.
+        if (
+            hyperscan is not None
+            and not ignore_case
+            and not any("\0" in s for s in self.substrings)
+        ):
+            database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            database.compile(
+                expressions=[re.escape(s.encode("utf-8")) for s in self.substrings],
+                ids=list(range(len(self.substrings))),
+                elements=len(self.substrings),
+                flags=hyperscan.HS_FLAG_SINGLEMATCH,
+            )
+            self._database = database
+            # Hyperscan scratch space can't be shared by threads scanning
+            # at the same time. Each thread gets its own.
+            self._local = threading.local()
+
+    def search(self, line: str, pos: int = 0) -> bool:
+        """Return True if line from index pos on contains any of the substrings."""
+        if self._always:
+            return True
+        if self.ignore_case:
+            if line.isascii() or not pos:
+                line = line.lower()
+            else:
+                # str.lower() can lengthen the line so drop the part before
+                # pos first, then search the lowered rest from its start.
+                line = line[pos:].lower()
+                pos = 0
+        if self._few:
+            for substring in self.substrings:
+                if substring in line and (not pos or line.find(substring, pos) >= 0):
+                    return True
+            return False
+        if self._automaton is not None:
+            return next(self._automaton.iter(line, pos), None) is not None
+        if self._regex is not None:
+            return self._regex.search(line, pos) is not None
+        return False
+
+    def search_block(self, data: bytes, block: str) -> bool:
+        """Return True if a block contains any of the substrings.
+
+        The block is given both as UTF-8 encoded data and decoded to text.
+        """
+        if self._database is None:
+            return self.search(block)
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = hyperscan.Scratch(self._database)
+        try:
+            self._database.scan(data, match_event_handler=stop_scan, scratch=scratch)
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+
+
+# Table for bytes.translate() that lowercases ASCII letters.
+LOWER_TABLE = bytes.maketrans(
+    string.ascii_uppercase.encode("ascii"), string.ascii_lowercase.encode("ascii")
+)
+
+# The only non-ASCII characters that str.lower() changes to an ASCII letter.
+LOWER_TO_ASCII = {
+    "i": "\u0130",  # LATIN CAPITAL LETTER I WITH DOT ABOVE
+    "k": "\u212a",  # KELVIN SIGN
+}
+
+
+def seed_characters(lowered_patterns: List[str]) -> Optional[FrozenSet[str]]:
+    """Characters that a line must contain to match any of the lowered patterns.
+
+    These are the first characters of the patterns in either case. A line
+    that contains none of them can't match so it need not be searched.
+    Return None when a pattern is empty or starts with a non-ASCII character.
+    """
+    seed: Set[str] = set()
+    for pattern in lowered_patterns:
+        if not pattern or not pattern[0].isascii():
+            return None
+        first = pattern[0]
+        seed.update((first, first.upper()))
+        if first in LOWER_TO_ASCII:
+            seed.add(LOWER_TO_ASCII[first])
+    return frozenset(seed)
+
+
+class AsciiPrefilter:
+    """Check raw bytes for any of the lowercase ASCII patterns in any case.
+
+    The bytes are lowercased by bytes.translate() which runs in C and
+    needs no decoding. That is much faster than decoding then str.lower().
+    """
+
+    def __init__(self, lowered_patterns: List[str]):
+        self.usable = all(p.isascii() for p in lowered_patterns)
+        self._patterns = tuple(p.encode("utf-8") for p in lowered_patterns)
+        # bytes.translate() won't lowercase these to a pattern letter.
+        self._not_translated = tuple(
+            c.encode("utf-8")
+            for letter, c in LOWER_TO_ASCII.items()
+            if any(letter in p for p in lowered_patterns)
+        )
+
+    def search(self, data: bytes) -> Optional[bool]:
+        """Return True if data contains any of the patterns ignoring case.
+
+        Return None if data can't be checked here.
+        """
+        if not self.usable or any(c in data for c in self._not_translated):
+            return None
+        lowered = data.translate(LOWER_TABLE)
+        return any(pattern in lowered for pattern in self._patterns)
+
+
 class Config:
-    """Process TOML configuration file parts into object attributes."""
+    """Process TOML configuration file parts into object attributes.
+
+    Each key in [tool.logview] becomes an attribute of the same name.
+    Keys missing from the configuration file get the default values.
+    Objects built from the keys are made once when the file is loaded,
+    so the attributes are not to be changed after that.
+    """
+
+    log_file_directory: str
+    archives: str
+    repository: str
+    contains_member: str
+    do_not_scan: List[str]
+    do_not_show: List[str]
+    show_at_end: List[str]
+    keep_timetags: bool
+    do_not_print: List[str]
+    summary_title: str
+    summary_color: str
+    summary_patterns: List[str]
+    summary_exemptions: List[str]
 
     def __init__(self, config_file_path: Optional[Path]):
         """Decode .toml configuration file."""
         self.config_file_path = config_file_path
+        settings = toml_loads(default_config)["tool"]["logview"]
         # Use default values if filename is an empty string.
-        if config_file_path is None:
-            text = default_config
-        else:
+        if config_file_path is not None:
             text = config_file_path.read_text(encoding="utf-8")
-        config = tomllib.loads(text)
-        self._my_config = config["tool"]["logview"]
+            config = toml_loads(text)
+            for name, value in config["tool"]["logview"].items():
+                if name not in settings:
+                    msg = "Error- Unknown key {} in config file [tool.logview]."
+                    msg += " Spelling?."
+                    print(msg.format(name))
+                    raise KeyError(name)
+                settings[name] = value
+        for name, value in settings.items():
+            setattr(self, name, value)
+        # Check the color now, not when the first line is flagged.
+        if self.summary_color not in COLOR_MAP:
+            msg = "Error- Unknown color name {} for key summary_color"
+            msg += " in config file [tool.logview]."
+            print(msg.format(self.summary_color))
+            raise KeyError(self.summary_color)
         self.phrases: List[Highlighter] = []
-        for text, color in self._my_config["phrases"].items():
+        for text, color in settings["phrases"].items():
             try:
-                _ = ColorName[color]
+                color_sequence = COLOR_MAP[color]
             except KeyError:
                 msg = "Unknown color name {} in config file [tool.logview.phrases]"
                 print(msg.format(color))
                 raise
-            phrase = Highlighter(text=text, color_enum=ColorName[color])
+            phrase = Highlighter(text=text, color_sequence=color_sequence)
             self.phrases.append(phrase)
-
-    def get(self, name: str) -> Any:
-        """Get value of a key from the configuration file."""
-        if name not in self._my_config:
-            msg = "Error- Unknown key {} in config file [tool.logview]. Spelling?."
-            print(msg.format(name))
-        return self._my_config[name]
+        self.colorizer = Colorizer(self.phrases)
+        # Substrings searched for in every log line.
+        self.do_not_print_set = SubstringSet(self.do_not_print)
+        self.summary_exemption_set = SubstringSet(self.summary_exemptions)
+        # Summary patterns match any case. The set lowercases the patterns
+        # and each line it searches.
+        self.summary_set = SubstringSet(self.summary_patterns, ignore_case=True)
+        lowered_summary_patterns = [e.lower() for e in self.summary_patterns]
+        self.summary_seed = seed_characters(lowered_summary_patterns)
+        self.summary_prefilter = AsciiPrefilter(lowered_summary_patterns)
+        # Archive member patterns never change so split them just once.
+        self.pattern_parts = {
+            "do_not_scan": [split_pattern(p) for p in self.do_not_scan],
+            "do_not_show": [split_pattern(p) for p in self.do_not_show],
+            "show_at_end": [split_pattern(p) for p in self.show_at_end],
+        }
+        self.pattern_parts["contains_member"] = [split_pattern(self.contains_member)]
+
+    @cached_property
+    def summary_color_sequence(self) -> str:
+        """ANSI sequence of summary_color."""
+        return COLOR_MAP[self.summary_color]
+
+    @cached_property
+    def summary_colorizer(self) -> Colorizer:
+        """Colorize the summary patterns in the lines of the summary."""
+        return Colorizer(
+            [
+                Highlighter(text=s, color_sequence=self.summary_color_sequence)
+                for s in self.summary_patterns
+            ]
+        )
 
 
 TIMETAG_SIZE = 28  # time tag at start of each line
 
 
+@lru_cache(maxsize=4096)
 def name_key_function(name: str) -> str:
     """Order files that start with digits in numeric order so 2 is before 11.
 
     Replace a run of digit characters at the start of the filename with a
     5 character string padded out with leading zeros.
     Also replace the same if immediately after a slash.
+    Archives found by --auto-locate-logfile share most member names
+    so keys are cached.
+    """
+    parts = name.split("/")
+    for index, part in enumerate(parts):
+        rest = part.lstrip(string.digits)
+        if len(rest) < len(part):
+            digits = part[: len(part) - len(rest)]
+            parts[index] = format(int(digits), "05d") + rest
+    return "/".join(parts)
+
+
+GLOB_CHARS = "*?["  # characters that are special to fnmatch
+
+
+def compile_part(part: str) -> Callable[[str], Any]:
+    """Return a function that tests a filename part against a pattern part.
+
+    Most patterns are either a literal name or a "*.ext" style suffix.
+    Those are tested with plain str methods which are much faster than
+    fnmatch.fnmatch. Any other pattern uses the regular expression
+    that fnmatch would build, compiled just once.
     """
-    leading_digits = r"^([0-9]+)[^0-9]*"
-    match1 = re.search(pattern=leading_digits, string=name)
-    if match1 is not None:
-        digits1 = match1.group(1)
-        prefix1 = format(int(digits1), "05d")
-        name = name.replace(digits1, prefix1)
-
-    slash_leading_digits = r"/([0-9]+)[^0-9]*"
-    match2 = re.search(pattern=slash_leading_digits, string=name)
-    if match2 is not None:
-        digits2 = match2.group(1)
-        prefix2 = format(int(digits2), "05d")
-        name = name.replace(digits2, prefix2)
-    return name
+    part = os.path.normcase(part)
+    if not any(c in part for c in GLOB_CHARS):
+        return part.__eq__
+    suffix = part[1:]
+    if part.startswith("*") and not any(c in suffix for c in GLOB_CHARS):
+        return lambda name: name.endswith(suffix)
+    return re.compile(fnmatch.translate(part)).match
 
 
 class MemberFilter:
     """Sensible ordering, glob and fnmatch like selection of filenames from ZipFile."""
 
     def __init__(self, zip: ZipFile):
-        """Sensibly order the archive member filenames, retrieve timestamp."""
+        """Sensibly order the archive member filenames."""
+        self._zip = zip
         filenames = [f.filename for f in zip.infolist() if not f.is_dir()]
         self.ordered_filenames = sorted(filenames, key=name_key_function)
-        self._parts = [Path(file).parts for file in self.ordered_filenames]
-        # We assume every line in every archive member file starts with a timestamp.
-        # Get from the first line of the first of the sensibly ordered members.
-        text = zip.read(self.ordered_filenames[0]).decode(encoding="utf-8")
-        self.timestamp = text[:TIMETAG_SIZE]
+        # Filenames grouped by their number of parts so select() only
+        # compares a pattern to filenames with the same number of parts.
+        # Each is kept with its parts case normalized the same way
+        # fnmatch.fnmatch() does.
+        self._parts_by_len: Dict[int, List[Tuple[str, PatternParts]]] = {}
+        for file in self.ordered_filenames:
+            normcase_parts = tuple(os.path.normcase(p) for p in split_pattern(file))
+            candidates = self._parts_by_len.setdefault(len(normcase_parts), [])
+            candidates.append((file, normcase_parts))
+        # Selections already made, keyed by their patterns.
+        self._select_cache: Dict[Tuple[PatternParts, ...], List[str]] = {}
+
+    @cached_property
+    def timestamp(self) -> str:
+        """Timestamp at the start of the first of the sensibly ordered members.
+
+        We assume every line in every archive member file starts with a timestamp.
+        Only the start of the member is decompressed.
+        """
+        with self._zip.open(self.ordered_filenames[0]) as raw, io.TextIOWrapper(
+            raw, encoding="utf-8", newline=""
+        ) as reader:
+            return reader.read(TIMETAG_SIZE)
 
-    def select(self, patterns: List[str]) -> List[str]:
+    def select(self, patterns: List[PatternParts]) -> List[str]:
         """Select from files those that match any of the patterns.
 
-        A filename is compared to a pattern part by part as described by
-        pathlib.Path().parts. The individual part is compared using
+        Each pattern is given already split into parts by split_pattern().
+        A filename is compared to a pattern part by part, split at each
+        "/" by split_pattern(). The individual part is compared using
         fnmatch.fnmatch style wild cards.
         Slashes "/" are significant to separate the parts. To match
         files in directory dir use something like "dir/*".
         A pattern like "*.txt" will only match filenames that don't
         contain a "/".
+        The same patterns select the same files so selections are cached.
         """
-        matches = []
-        for pattern in patterns:
-            pattern_parts = Path(pattern).parts
-            for filename_parts in self._parts:
-                if len(filename_parts) == len(pattern_parts):
-                    if all(
-                        fnmatch.fnmatch(f, p)
-                        for f, p in zip(filename_parts, pattern_parts)
-                    ):
-                        matches.append("/".join(filename_parts))
-        return matches
+        key = tuple(patterns)
+        matches = self._select_cache.get(key)
+        if matches is None:
+            matches = []
+            for pattern in patterns:
+                tests = [compile_part(p) for p in pattern]
+                for name, normcase_parts in self._parts_by_len.get(len(tests), []):
+                    if all(test(f) for test, f in zip(tests, normcase_parts)):
+                        matches.append(name)
+            self._select_cache[key] = matches
+        # Return a copy so the caller can't change the cached selection.
+        return list(matches)
+
+
+# Line that names the checked out repository. A block is searched
+# all at once so the "\r" of a "\r\n" line ending is left out.
+REPOSITORY_LINE = re.compile(r"^.*  repository: (.*?)\r?$", re.MULTILINE)
 
 
 def identify_repository(matcher: MemberFilter, zip: ZipFile) -> Optional[str]:
@@ -238,13 +600,13 @@ def identify_repository(matcher: MemberFilter, zip: ZipFile) -> Optional[str]:
 
     Assumes the action script only checked out one repository.
     """
-    for member in matcher.select(["*.txt"]):
-        text = zip.read(member).decode(encoding="utf-8")
-        lines = text.splitlines()
-        for line in lines:
-            m = re.search(pattern=r"^.*  repository: (.*)$", string=line)
-            if m:
-                return m.group(1)
+    for member in matcher.select([split_pattern("*.txt")]):
+        # Stream the member so decompression stops at the repository line.
+        with zip.open(member) as raw:
+            for data in read_blocks(raw):
+                m = REPOSITORY_LINE.search(data.decode(encoding="utf-8"))
+                if m:
+                    return m.group(1)
     return None
 
 
@@ -258,129 +620,278 @@ def show_action_log(logfile_path: Path, config: Config) -> None:
         if repository:
             print("repository: ", repository)
         print()
-        not_scanned = set(matcher.select(config.get("do_not_scan")))
-        not_printed = set(matcher.select(config.get("do_not_show")))
-        for filename1 in matcher.ordered_filenames:
-            if filename1 in not_scanned:
-                continue
-            is_printed = filename1 not in not_printed
+        not_scanned = set(matcher.select(config.pattern_parts["do_not_scan"]))
+        not_printed = set(matcher.select(config.pattern_parts["do_not_show"]))
+        show_members_again = matcher.select(config.pattern_parts["show_at_end"])
+        # Keep the blocks of members shown again at the end so they
+        # are only decompressed once.
+        shown_again = set(show_members_again)
+        saved_blocks: Dict[str, List[bytes]] = {}
+        # Check all files for errors even if they are not printed.
+        members = [
+            (filename, filename not in not_printed)
+            for filename in matcher.ordered_filenames
+            if filename not in not_scanned
+        ]
+        for filename1, is_printed, scanned in scan_members(
+            logfile_path, config, members, keep=shown_again
+        ):
+            # Write the member's header and lines with one call.
+            header = ""
             if is_printed:
-                print()
-                print("=" * 80)
-                print("name:", filename1)
-                print()
-            # Check all files for errors even if they are not printed.
-            text = zip.read(filename1).decode(encoding="utf-8")
-            e = check_one_file(config, filename1, text, is_printed=is_printed)
-            summary.extend(e)
+                header = "\n{}\nname: {}\n\n".format("=" * 80, filename1)
+            sys.stdout.write(header + "".join(scanned.output))
+            summary.extend(scanned.summary)
+            if scanned.blocks is not None:
+                saved_blocks[filename1] = scanned.blocks
 
         print()
         print()
         if summary:
-            title = config.get("summary_title")
-            color = config.get("summary_color")
+            title = config.summary_title
             print(title.join([" ------------------- ", " ------------------- "]))
-            error_phrases = [
-                Highlighter(text=s, color_enum=ColorName[color])
-                for s in config.get("summary_patterns")
-            ]
-            for line in summary:
-                line = colorize_line(line=line, phrases=error_phrases)
-                print(line)
+            colorize = config.summary_colorizer.colorize_line
+            sys.stdout.write("".join(colorize(line) + "\n" for line in summary))
         else:
             print("Nothing found for summary.")
 
         # Repeat a few specific archive members at the very end.
         # Not subject to the do_not_show configuration.
-        show_members_again = matcher.select(config.get("show_at_end"))
         if show_members_again:
             print()
             print()
             print("Displaying archive members selected by 'show_at_end':")
             print()
-            for filename2 in matcher.select(config.get("show_at_end")):
-                print("=" * 80)
-                print("name:", filename2)
-                text2 = zip.read(filename2).decode(encoding="utf-8")
-                _ = check_one_file(config, filename2, text2, is_printed=True)
-                print()
+            for filename2 in show_members_again:
+                output2 = ["{}\nname: {}\n".format("=" * 80, filename2)]
+                if filename2 in saved_blocks:
+                    saved2 = saved_blocks[filename2]
+                    _ = check_one_file(
+                        config, filename2, saved2, True, write=output2.append
+                    )
+                else:
+                    with zip.open(filename2) as raw2:
+                        blocks2 = read_blocks(raw2)
+                        _ = check_one_file(
+                            config, filename2, blocks2, True, write=output2.append
+                        )
+                output2.append("\n")
+                sys.stdout.write("".join(output2))
 
         print()
         print(logfile_path, matcher.timestamp)
 
 
+BLOCK_SIZE = 64 * 1024  # bytes of an archive member read at once
+
+
+def read_blocks(raw: IO[bytes]) -> Iterator[bytes]:
+    """Read an archive member a block of whole lines at a time.
+
+    Each block ends at the last newline in a chunk of BLOCK_SIZE bytes.
+    The partial line after it is carried over to the next block.
+    """
+    carry = b""
+    while True:
+        chunk = raw.read(BLOCK_SIZE)
+        if not chunk:
+            break
+        end = chunk.rfind(b"\n") + 1
+        if end:
+            yield carry + chunk[:end]
+            carry = chunk[end:]
+        else:
+            carry += chunk
+    if carry:
+        yield carry
+
+
 def check_one_file(
-    config: Config, filename: str, text: str, is_printed: bool
+    config: Config,
+    filename: str,
+    blocks: Iterable[bytes],
+    is_printed: bool,
+    write: Optional[Callable[[str], Any]] = None,
 ) -> List[str]:
-    """Colorize phrases in text and check for error phrases."""
+    """Colorize phrases in blocks of text lines and check for error phrases.
+
+    Printed lines are passed to write which defaults to sys.stdout.write.
+    """
     summary = []
-    lowered_errors = [
-        e.lower() for e in config.get("summary_patterns")
-    ]  # assure case insensitive
-    lines = text.splitlines()
-    for num, line in enumerate(lines, start=1):
-        # Discard the line if it has any from do_not_print key as a substring.
-        if any(True for pattern in config.get("do_not_print") if pattern in line):
+    # Look up the configuration once, not for every line.
+    do_not_print = config.do_not_print_set.search
+    do_not_print_block = config.do_not_print_set.search_block
+    # Each line is assumed to start with a time tag like this:
+    # 2021-11-14T02:31:28.6752380Z
+    # Unless it is kept, search and show the line from just after it.
+    offset = 0 if config.keep_timetags else TIMETAG_SIZE
+    is_exempt = config.summary_exemption_set.search
+    is_exempt_block = config.summary_exemption_set.search_block
+    is_error = config.summary_set.search  # case insensitive
+    is_error_block = config.summary_set.search_block
+    seed = config.summary_seed
+    prefilter = config.summary_prefilter.search
+    colorize = config.colorizer.colorize_line
+    # Flagged lines are highlighted the same way as Highlighter does it.
+    summary_prefix = config.summary_color_sequence
+    summary_suffix = RESET if summary_prefix else ""
+    if write is None:
+        write = sys.stdout.write
+    num = 0
+    for data in blocks:
+        # Most of a log has no summary patterns at all. Search the whole
+        # block once and skip the per line summary checks when none are found.
+        may_flag = prefilter(data)
+        block = data.decode(encoding="utf-8")
+        if may_flag is None:
+            may_flag = is_error_block(data, block)
+        lines = block.splitlines()
+        if not may_flag and not is_printed:
+            num += len(lines)
             continue
+        # Likewise only check lines for do_not_print and summary_exemptions
+        # strings when the block contains one.
+        may_exclude = do_not_print_block(data, block)
+        may_exempt = may_flag and is_exempt_block(data, block)
+        # Printed lines are collected and written once per block.
+        out: List[str] = []
+        for line in lines:
+            num += 1
+            # Discard the line if it has any from do_not_print key as a substring.
+            if may_exclude and do_not_print(line):
+                continue
+
+            # Highlight and save for error summary if flagging a line.
+            # Flag if line does not contain a string from summary_exemptions
+            # and does contain a string from summary_patterns.
+            # summary_patterns strings are case-insensitive.
+            # summary_exemptions strings match exact case only.
+            # Exemptions are checked once, before the summary patterns.
+            is_flagged = False
+            if may_flag and not (may_exempt and is_exempt(line, offset)):
+                # Only search the line if it could possibly match.
+                if seed is None or not seed.isdisjoint(line):
+                    is_flagged = is_error(line, offset)
+            if is_flagged:
+                line = line[offset:]
+                # Save to summary without colorizing.
+                summary.append("{: 3d} {} {}".format(num, filename, line))
+                if is_printed:
+                    # Print entire colorized line identified for the summary.
+                    if ANSI_START not in line:
+                        line = summary_prefix + line + summary_suffix
+                    out.append("{: 3d} {}\n".format(num, line))
+            else:
+                if is_printed:
+                    # Colorize all phrases in the line.
+                    line = colorize(line[offset:])
+                    out.append("{: 3d} {}\n".format(num, line))
+        write("".join(out))
+    return summary
+
+
+MAX_WORKERS = min(8, os.cpu_count() or 1)  # threads that scan archive members
+
+
+class ScannedMember(NamedTuple):
+    """Results of checking one archive member in a worker thread."""
+
+    output: List[str]  # printed text
+    summary: List[str]
+    blocks: Optional[List[bytes]]  # member text, if it was asked to be kept
+
+
+class MemberScanner:
+    """Decompress and check archive members from worker threads.
+
+    Each thread opens its own ZipFile on the log archive. zlib releases
+    the GIL while inflating so members are decompressed in parallel.
+    """
 
-        if not config.get("keep_timetags"):
-            # Chop off the start of the line which is assumed to start
-            # with a time tag like this: 2021-11-14T02:31:28.6752380Z
-            line = line[TIMETAG_SIZE:]
-        # Highlight and save for error summary if flagging a line.
-        # Flag if line contains a string from _errors and line does not
-        # contain a string from config error_exemptions.
-        # config errors strings are case-insensitive.
-        # config error_exemptions strings match exact case only.
-        lowered_line = line.lower()
-        if any(
-            True
-            for error in lowered_errors
-            if error in lowered_line
-            and not any(
-                True for exempt in config.get("summary_exemptions") if exempt in line
+    def __init__(self, logfile_path: Path, config: Config):
+        self.logfile_path = logfile_path
+        self.config = config
+        self._local = threading.local()
+        self._zips: List[ZipFile] = []
+
+    def scan(self, filename: str, is_printed: bool, keep: bool) -> ScannedMember:
+        """Check one member, collecting its printed text."""
+        zip = getattr(self._local, "zip", None)
+        if zip is None:
+            zip = self._local.zip = ZipFile(self.logfile_path)
+            self._zips.append(zip)
+        output: List[str] = []
+        kept: Optional[List[bytes]] = None
+        with zip.open(filename) as raw:
+            blocks: Iterable[bytes] = read_blocks(raw)
+            if keep:
+                blocks = kept = list(blocks)
+            summary = check_one_file(
+                self.config, filename, blocks, is_printed, write=output.append
             )
-        ):
-            # Save to summary without colorizing.
-            summary.append("{: 3d} {} {}".format(num, filename, line))
-            if is_printed:
-                # Print entire colorized line identified for the summary.
-                color = config.get("summary_color")
-                line = colorize_line(
-                    line=line,
-                    phrases=[Highlighter(text=line, color_enum=ColorName[color])],
+        return ScannedMember(output, summary, kept)
+
+    def close(self) -> None:
+        """Close the ZipFiles opened by the worker threads."""
+        for zip in self._zips:
+            zip.close()
+
+
+def scan_members(
+    logfile_path: Path,
+    config: Config,
+    members: List[Tuple[str, bool]],
+    keep: Set[str],
+) -> Iterator[Tuple[str, bool, ScannedMember]]:
+    """Check (filename, is_printed) members in a thread pool.
+
+    Yield the results in the same order as members. Only a few members
+    are scanned ahead of the one being yielded to limit memory use.
+    Keep the blocks of the members whose filenames are in keep.
+    """
+    scanner = MemberScanner(logfile_path, config)
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            pending: Deque[Tuple[str, bool, "Future[ScannedMember]"]] = deque()
+            for filename, is_printed in members:
+                future = executor.submit(
+                    scanner.scan, filename, is_printed, filename in keep
                 )
-                print(format(num, " 3d"), line)
-        else:
-            if is_printed:
-                # Colorize all phrases in the line.
-                line = colorize_line(line=line, phrases=config.phrases)
-                print(format(num, " 3d"), line)
-    return summary
+                pending.append((filename, is_printed, future))
+                if len(pending) > 2 * MAX_WORKERS:
+                    filename1, is_printed1, future1 = pending.popleft()
+                    yield filename1, is_printed1, future1.result()
+            while pending:
+                filename1, is_printed1, future1 = pending.popleft()
+                yield filename1, is_printed1, future1.result()
+    finally:
+        scanner.close()
 
 
 def locate_log_file(config: Config) -> Optional[Path]:
     """Path to newest log archive meeting criteria."""
     files: List[Path] = []
-    log_file_directory = Path(config.get("log_file_directory"))
-    archive_glob = config.get("archives")
+    log_file_directory = Path(config.log_file_directory)
+    archive_glob = config.archives
     files.extend(log_file_directory.glob(archive_glob))
-    timestamps: List[Tuple[str, Path]] = []
+    # The timestamp and the contains_member check only decompress the
+    # start of one member so do them for every archive in one pass.
+    # Then look for the repository, which decompresses members, newest
+    # first only in archives that are newer than any matching member.
+    candidates: List[Tuple[str, Path, bool]] = []
     for file in files:
         with ZipFile(file) as zip:
             matcher = MemberFilter(zip)
-            # Check for presence of members that match the pattern.
-            members = matcher.select([config.get("contains_member")])
-            if members:
-                timestamps.append((matcher.timestamp, file))
-            repository = identify_repository(matcher, zip)
-            if repository == config.get("repository"):
-                timestamps.append((matcher.timestamp, file))
-    if timestamps:
-        newest_order = sorted(timestamps, reverse=True)
-        return newest_order[0][1]  # Path with newest timestamp
-    else:
-        return None
+            has_member = bool(matcher.select(config.pattern_parts["contains_member"]))
+            candidates.append((matcher.timestamp, file, has_member))
+    for _, file, has_member in sorted(candidates, reverse=True):
+        if has_member:
+            return file
+        if config.repository:
+            with ZipFile(file) as zip:
+                if identify_repository(MemberFilter(zip), zip) == config.repository:
+                    return file
+    return None
 
 
 def main() -> None:
@@ -399,6 +910,9 @@ def main() -> None:
         nargs="+",
     )
     args = parser.parse_args()
+    # Even on a terminal write the log in large chunks, not line by line.
+    if isinstance(sys.stdout, io.TextIOWrapper):
+        sys.stdout.reconfigure(line_buffering=False)
     config = Config(None)  # This is the default config
     if args.auto_locate_logfile:
         # Use config to locate a log file.
@@ -407,13 +921,13 @@ def main() -> None:
             config = Config(Path(args.files[0]))
             print("read config from", config.config_file_path)
         log_file = locate_log_file(config)
-        log_file_directory = Path(config.get("log_file_directory"))
+        log_file_directory = Path(config.log_file_directory)
         if not log_file:
             print("Could not find a logfile meeting criteria:")
             print("  log file directory=", log_file_directory)
-            print("  archives=", config.get("archives"))
-            print("  repository=", config.get("repository"))
-            print("  contains_member=", config.get("contains_member"))
+            print("  archives=", config.archives)
+            print("  repository=", config.repository)
+            print("  contains_member=", config.contains_member)
         else:
             print("log file directory=", log_file_directory)
             show_action_log(log_file, config=config)
@@ -0,0 +1,443 @@
+"""pytest test cases for logview.py functions and classes."""
+
+import fnmatch
+import io
+import json
+from pathlib import Path
+from pathlib import PurePosixPath
+from typing import List
+from zipfile import ZipFile
+
+import pytest
+
+import logview
+
+ARCHIVE = Path("tests/archives/logs_19.zip")
+
+
+@pytest.fixture()
+def archive():
+    """Return the example GitHub Actions log archive opened as a ZipFile."""
+    with ZipFile(ARCHIVE) as zip:
+        yield zip
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "*",
+        "*.txt",
+        "*/*.txt",
+        "1_docs.txt",
+        "docs/*",
+        "inspect/6_Code Style.txt",
+        "venv_tests (macos-latest)/7_*",
+        "*_docs.txt",
+        "[0-9]_*.txt",
+        "docs/?_*",
+        "*.zip",
+    ],
+)
+def test_select_same_as_fnmatch(archive, pattern):
+    """MemberFilter.select() picks the same members as fnmatch part by part."""
+    matcher = logview.MemberFilter(archive)
+    want = []
+    pattern_parts = Path(pattern).parts
+    for filename in matcher.ordered_filenames:
+        filename_parts = Path(filename).parts
+        if len(filename_parts) == len(pattern_parts):
+            if all(
+                fnmatch.fnmatch(f, p) for f, p in zip(filename_parts, pattern_parts)
+            ):
+                want.append(filename)
+    assert matcher.select([logview.split_pattern(pattern)]) == want
+    # A second selection comes from the cache.
+    assert matcher.select([logview.split_pattern(pattern)]) == want
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "*.txt",
+        "docs/*",
+        "docs//*/",
+        "./1_docs.txt",
+        "docs/./x",
+        "docs/../x",
+        "/1_docs.txt",
+    ],
+)
+def test_split_pattern(pattern):
+    """Patterns split into the same parts as PurePosixPath().parts."""
+    assert logview.split_pattern(pattern) == PurePosixPath(pattern).parts
+
+
+def test_split_pattern_root(archive):
+    """A pattern starting with a slash matches no member."""
+    matcher = logview.MemberFilter(archive)
+    assert matcher.select([logview.split_pattern("1_docs.txt")])
+    assert not matcher.select([logview.split_pattern("/1_docs.txt")])
+
+
+@pytest.fixture(params=["hyperscan", "ahocorasick", "re", "in"])
+def engine(request, monkeypatch):
+    """Make SubstringSet use each search engine in turn.
+
+    The optional packages that aren't installed are skipped.
+    The automaton is used even for the few substrings in the tests.
+    "re" is the regular expression and "in" checks one substring at a time.
+    """
+    if request.param == "re":
+        monkeypatch.setattr(logview, "FEW_SUBSTRINGS", 0)
+    elif request.param != "in" and getattr(logview, request.param) is None:
+        pytest.skip("{} is not installed".format(request.param))
+    if request.param != "hyperscan":
+        monkeypatch.setattr(logview, "hyperscan", None)
+    if request.param == "ahocorasick":
+        monkeypatch.setattr(logview, "AHOCORASICK_MIN", 1)
+    else:
+        monkeypatch.setattr(logview, "ahocorasick", None)
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "substrings, line, expected",
+    [
+        (["warning", "error"], "an error here", True),
+        (["warning", "error"], "all good", False),
+        ([], "anything", False),
+        (["", "error"], "anything", True),
+    ],
+)
+def test_substring_set(engine, substrings, line, expected):
+    """SubstringSet finds any of the substrings in the line."""
+    assert logview.SubstringSet(substrings).search(line) is expected
+
+
+@pytest.mark.parametrize(
+    "line, pos, expected",
+    [
+        ("an error here", 0, True),
+        ("an error here", 3, True),
+        ("an error here", 4, False),
+        ("\u0130\u0130 error", 3, True),
+        ("\u0130\u0130 error", 4, False),
+    ],
+)
+def test_substring_set_pos(engine, line, pos, expected):
+    """The search starts at pos in the line."""
+    assert logview.SubstringSet(["error"]).search(line, pos) is expected
+    assert logview.SubstringSet(["error"], ignore_case=True).search(line, pos) is (
+        expected
+    )
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("an ERROR here", True),
+        ("a Warning", True),
+        ("all good", False),
+        ("Process Completed With Exit Code 1", True),
+        # These match with case folding but not with str.lower().
+        ("warn\u0131ng", False),
+        ("Proce\u017fs completed with exit code 1", False),
+        ("warn\u0130ng", False),
+        # str.lower() makes the Kelvin sign a "k".
+        ("\u212aill", True),
+    ],
+)
+def test_substring_set_ignore_case(engine, line, expected):
+    """With ignore_case the lowered substrings are in the lowered line."""
+    substrings = logview.SubstringSet(
+        ["Error", "warning", "process completed", "kill"], ignore_case=True
+    )
+    assert substrings.search(line) is expected
+    assert not substrings.search("error: x", 1)
+    # The same line found by each engine with ignore_case and pos.
+    assert substrings.search("\u0130 " + line, 2) is expected
+
+
+@pytest.mark.parametrize("ignore_case", [False, True])
+def test_substring_set_block(engine, ignore_case):
+    """A block is searched from its UTF-8 data or its text."""
+    substrings = logview.SubstringSet(["error", "\u00e9chec"], ignore_case)
+    for block, expected in [
+        ("first\nan error here\n", True),
+        ("first\n\u00e9chec\n", True),
+        ("first\nall good\n", False),
+    ]:
+        assert substrings.search_block(block.encode("utf-8"), block) is expected
+
+
+def test_substring_set_engine(engine):
+    """The engine in use is the one asked for."""
+    substrings = logview.SubstringSet(["error", "warning"])
+    assert (substrings._database is not None) is (engine == "hyperscan")
+    assert (substrings._automaton is not None) is (engine == "ahocorasick")
+    assert (substrings._regex is not None) is (engine == "re")
+    if engine == "in":
+        # The regular expression is used for a common first character.
+        assert logview.SubstringSet(["error", "eek"])._regex is not None
+
+
+def test_substring_set_exact_case(engine):
+    """Without ignore_case the substrings match exact case only."""
+    assert not logview.SubstringSet(["Error"]).search("an ERROR here")
+
+
+def test_name_key_function():
+    """Digits at the start of a name or after a slash sort numerically."""
+    names = ["11_b.txt", "2_a.txt", "job/10_x.txt", "job/9_y.txt", "2_a/11_z.txt"]
+    assert sorted(names, key=logview.name_key_function) == [
+        "2_a.txt",
+        "2_a/11_z.txt",
+        "11_b.txt",
+        "job/9_y.txt",
+        "job/10_x.txt",
+    ]
+    # Only the leading run of digits is padded, not later copies of it.
+    assert logview.name_key_function("1_job1.txt") == "00001_job1.txt"
+
+
+def test_colorizer():
+    """Colorizer highlights every phrase but leaves colorized lines alone."""
+    colorizer = logview.Colorizer(
+        [
+            logview.Highlighter(
+                text="PASSED", color_sequence=logview.COLOR_MAP["GREEN"]
+            ),
+            logview.Highlighter(text="FAILED", color_sequence=logview.COLOR_MAP["RED"]),
+        ]
+    )
+    green = logview.COLOR_MAP["GREEN"]
+    red = logview.COLOR_MAP["RED"]
+    reset = logview.COLOR_MAP["RESET"]
+    got = colorizer.colorize_line("a PASSED b FAILED c PASSED")
+    want = "a {0}PASSED{2} b {1}FAILED{2} c {0}PASSED{2}".format(green, red, reset)
+    assert got == want
+    assert colorizer.colorize_line(got) == got
+    assert logview.Colorizer([]).colorize_line("PASSED") == "PASSED"
+
+
+def test_timestamp(archive):
+    """The timestamp is the time tag at the start of the first member."""
+    matcher = logview.MemberFilter(archive)
+    assert matcher.timestamp == "2021-11-10T19:01:46.8399754Z"
+
+
+def test_seed_characters():
+    """Seed characters are the first characters of the patterns in any case."""
+    seed = logview.seed_characters(["warning", "error", "process completed"])
+    assert seed == frozenset("wWeEpP")
+    assert "K" in logview.seed_characters(["kelvin"])
+    assert logview.seed_characters([]) == frozenset()
+    assert logview.seed_characters(["", "error"]) is None
+    assert logview.seed_characters(["échec"]) is None
+
+
+def test_config_defaults():
+    """Keys missing from a configuration file get the default values."""
+    config = logview.Config(Path("tests/configs/repository.toml"))
+    default = logview.Config(None)
+    assert config.summary_title == "repository"
+    assert default.summary_title == "errors"
+    assert config.archives == default.archives
+
+
+def write_config(path, **settings):
+    """Write a configuration file that sets the [tool.logview] keys."""
+    lines = ["[tool.logview]"]
+    # A JSON string or list of strings is also a TOML one.
+    lines.extend("{} = {}".format(k, json.dumps(v)) for k, v in settings.items())
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return logview.Config(path)
+
+
+def test_config_unknown_key(tmp_path):
+    """An unknown key in a configuration file is an error."""
+    path = tmp_path / "misspelled.toml"
+    path.write_text('[tool.logview]\nsumary_title = "x"\n', encoding="utf-8")
+    with pytest.raises(KeyError):
+        logview.Config(path)
+
+
+def test_config_unknown_summary_color(tmp_path, capsys):
+    """A misspelled summary_color is an error when the file is loaded."""
+    with pytest.raises(KeyError):
+        write_config(tmp_path / "color.toml", summary_color="REDD")
+    assert "Unknown color name REDD" in capsys.readouterr().out
+
+
+def test_read_blocks(monkeypatch):
+    """Blocks end at a line boundary and hold all the text."""
+    monkeypatch.setattr(logview, "BLOCK_SIZE", 8)
+    data = "first line\r\nsecond\nthird\n\nfourth \u00e9\u00e9 end".encode("utf-8")
+    blocks = list(logview.read_blocks(io.BytesIO(data)))
+    assert all(block.endswith(b"\n") for block in blocks[:-1])
+    assert b"".join(blocks) == data
+
+
+@pytest.mark.parametrize(
+    "patterns, data, expected",
+    [
+        (["error", "warning"], b"an ERROR here", True),
+        (["error", "warning"], b"all good", False),
+        (["kill"], "\u212aILL".encode("utf-8"), None),
+        (["\u00e9chec"], b"anything", None),
+    ],
+)
+def test_ascii_prefilter(patterns, data, expected):
+    """AsciiPrefilter ignores case or declines to check."""
+    assert logview.AsciiPrefilter(patterns).search(data) is expected
+
+
+def test_check_one_file(capsys):
+    """Lines are skipped, exempted, flagged and numbered as configured."""
+    config = logview.Config(None)
+    tag = "2021-11-14T02:31:28.6752380Z "
+    text = "".join(
+        tag + line + "\n"
+        for line in [
+            "first",
+            "remote: Counting objects: 5",
+            "an Error here",
+            "Evaluating continue on error",
+            "PASSED",
+        ]
+    )
+    summary = logview.check_one_file(
+        config, "job.txt", [text.encode("utf-8")], is_printed=True
+    )
+    assert summary == ["  3 job.txt  an Error here"]
+    lines = capsys.readouterr().out.splitlines()
+    assert [line[:4] for line in lines] == ["  1 ", "  3 ", "  4 ", "  5 "]
+    assert lines[1] == "  3 " + logview.COLOR_MAP["RED"] + " an Error here" + (
+        logview.COLOR_MAP["RESET"]
+    )
+    assert lines[2] == "  4  Evaluating continue on error"
+
+
+class RecordingZipFile(ZipFile):
+    """ZipFile that remembers every instance so they can be checked closed."""
+
+    opened: List[ZipFile] = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened.append(self)
+
+
+@pytest.fixture()
+def recording_zipfile(monkeypatch):
+    """Record the ZipFiles opened by logview."""
+    monkeypatch.setattr(RecordingZipFile, "opened", [])
+    monkeypatch.setattr(logview, "ZipFile", RecordingZipFile)
+    return RecordingZipFile.opened
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_scan_members(archive, monkeypatch, recording_zipfile, max_workers):
+    """Members are yielded in order, the same as checking them one by one."""
+    monkeypatch.setattr(logview, "MAX_WORKERS", max_workers)
+    config = logview.Config(None)
+    filenames = logview.MemberFilter(archive).ordered_filenames
+    assert len(filenames) > 2 * max_workers
+    members = [(f, i % 2 == 0) for i, f in enumerate(filenames)]
+    keep = {filenames[1]}
+    results = list(logview.scan_members(ARCHIVE, config, members, keep))
+    assert [(f, p) for f, p, _ in results] == members
+    for filename, is_printed, scanned in results:
+        output: List[str] = []
+        with archive.open(filename) as raw:
+            blocks = list(logview.read_blocks(raw))
+        summary = logview.check_one_file(
+            config, filename, blocks, is_printed, write=output.append
+        )
+        assert scanned.output == output
+        assert scanned.summary == summary
+        assert scanned.blocks == (blocks if filename in keep else None)
+    assert recording_zipfile
+    assert all(zip.fp is None for zip in recording_zipfile)
+
+
+def test_scan_members_error(archive, recording_zipfile):
+    """An exception in a worker thread reaches the caller."""
+    config = logview.Config(None)
+    filenames = logview.MemberFilter(archive).ordered_filenames
+    members = [(filenames[0], True), ("no such member", True)]
+    results = logview.scan_members(ARCHIVE, config, members, set())
+    with pytest.raises(KeyError):
+        list(results)
+    assert all(zip.fp is None for zip in recording_zipfile)
+
+
+def test_show_at_end(archive, capsys, tmp_path):
+    """Members selected by show_at_end are shown again after the summary.
+
+    One was scanned so its kept blocks are checked again. The other is
+    in do_not_scan so it is read from the archive.
+    """
+    config = write_config(
+        tmp_path / "show_at_end.toml",
+        do_not_scan=["*/*"],
+        do_not_show=["*.txt"],
+        show_at_end=["1_docs.txt", "docs/1_Set up job.txt"],
+    )
+    logview.show_action_log(ARCHIVE, config)
+    out = capsys.readouterr().out
+    marker = "Displaying archive members selected by 'show_at_end':\n\n"
+    assert out.count(marker) == 1
+    want = []
+    for filename in config.show_at_end:
+        want.append("{}\nname: {}\n".format("=" * 80, filename))
+        with archive.open(filename) as raw:
+            logview.check_one_file(
+                config, filename, logview.read_blocks(raw), True, write=want.append
+            )
+        want.append("\n")
+    timestamp = logview.MemberFilter(archive).timestamp
+    want.append("\n{} {}\n".format(ARCHIVE, timestamp))
+    assert out.split(marker)[1] == "".join(want)
+    # Neither member is shown before the summary.
+    assert "name: 1_docs.txt" not in out.split(marker)[0]
+
+
+def test_identify_repository(archive):
+    """The repository is found in the top level members."""
+    matcher = logview.MemberFilter(archive)
+    repository = logview.identify_repository(matcher, archive)
+    assert repository == "tmarktaylor/pytest-phmdoctest"
+
+
+def make_archive(path, timestamp, repository):
+    """Write a one member log archive that names a repository."""
+    text = "{0} first\n{0}   repository: {1}\n".format(timestamp, repository)
+    with ZipFile(path, "w") as zip:
+        zip.writestr("1_job.txt", text)
+
+
+def test_locate_log_file(tmp_path, recording_zipfile):
+    """The newest archive for the repository is located.
+
+    Each archive is opened once, and again only to find its repository.
+    """
+    make_archive(tmp_path / "logs_1.zip", "2021-11-10T19:01:46.8399754Z", "a/one")
+    make_archive(tmp_path / "logs_2.zip", "2021-11-12T19:01:46.8399754Z", "a/one")
+    make_archive(tmp_path / "logs_3.zip", "2021-11-14T19:01:46.8399754Z", "b/two")
+    for contains_member, repository, want, opened in [
+        ("none/*", "a/one", "logs_2.zip", 3 + 2),
+        ("none/*", "c/three", None, 3 + 3),
+        ("none/*", "", None, 3),
+        ("*.txt", "", "logs_3.zip", 3),
+    ]:
+        config = write_config(
+            tmp_path / "locate.toml",
+            log_file_directory=str(tmp_path),
+            contains_member=contains_member,
+            repository=repository,
+        )
+        recording_zipfile.clear()
+        got = logview.locate_log_file(config)
+        assert got == (tmp_path / want if want else None)
+        assert len(recording_zipfile) == opened